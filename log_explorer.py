@@ -7,21 +7,344 @@ providing a summary of errors, potential issues, and insights using Claude 3.7 S
 """
 
 import argparse
+import asyncio
+import hashlib
+import io
 import json
+import logging
 import os
+import sqlite3
 import sys
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
 import time
 import re
 import boto3
+import botocore.config
+import botocore.exceptions
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from tabulate import tabulate
 from typing import Dict, List, Optional, Tuple, Union, Any
-import subprocess
 from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 
+# Optional: the asyncio client fans out log streams on one event loop (one
+# file descriptor per pod instead of a blocked worker thread), which lets
+# fetches scale past the threaded pod cap
+try:
+    from kubernetes_asyncio import client as async_client, config as async_config
+    _HAS_ASYNC_K8S = True
+except ImportError:
+    _HAS_ASYNC_K8S = False
+
+# Optional: aioboto3 lets concurrent Bedrock calls share one event loop
+# instead of tying up a worker thread each
+try:
+    import aioboto3
+    _HAS_AIOBOTO3 = True
+except ImportError:
+    _HAS_AIOBOTO3 = False
+
+# Optional: orjson parses bytes directly (no intermediate decode) and is
+# several times faster than stdlib json on the multi-KB Bedrock payloads
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+
+def _json_loads(data):
+    """Parse JSON from str/bytes with orjson when available, stdlib otherwise."""
+    if _HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps_compact(obj) -> str:
+    """Serialize compactly (no whitespace) with orjson when available."""
+    if _HAS_ORJSON:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(",", ":"))
+
+
+# Diagnostic/status output goes through this logger so the hot path emits
+# nothing unless --verbose enables DEBUG; results and errors still print
+logger = logging.getLogger(__name__)
+
+# Shared boto3 session: credential resolution and endpoint discovery happen
+# once per process, and every client built from it reuses the result
+_BOTO_SESSION = boto3.Session()
+
+# How long cached Bedrock responses stay valid (7 days)
+_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# On-disk record of the last model id that answered, so hot starts skip
+# discovery; invalidated and re-probed when an analysis call fails
+_MODEL_CACHE_PATH = os.path.expanduser("~/.log_explorer/model_cache.json")
+_MODEL_CACHE_TTL_SECONDS = 24 * 3600
+
+# Model ids probed when the configured model stops answering
+_FALLBACK_MODELS = [
+    "anthropic.claude-3-sonnet-20240229-v1:0",
+    "anthropic.claude-3-haiku-20240307-v1:0",
+    "anthropic.claude-v2:1",
+    "anthropic.claude-v2",
+    "anthropic.claude-instant-v1"
+]
+
+# Seconds per supported time_range unit, and the Prometheus query resolution
+# to use for ranges expressed in that unit
+_TIME_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+_TIME_STEPS = {'m': '15s', 'h': '1m', 'd': '1h'}
+
+
+def _parse_time_range(time_range: str) -> Tuple[int, str, str]:
+    """Parse a "1h"-style time range once for all code paths.
+
+    Args:
+        time_range: Time range in format "10m", "1h", "2d"
+
+    Returns:
+        Tuple of (seconds, duration, step) where duration is the
+        normalized value/unit string usable in PromQL range selectors and
+        step is the matching Prometheus query resolution.
+    """
+    time_value = int(time_range[:-1])
+    time_unit = time_range[-1].lower()
+
+    if time_unit not in _TIME_UNITS:
+        raise ValueError(f"Unsupported time unit: {time_unit}. Use 'm' for minutes, 'h' for hours, 'd' for days.")
+
+    return time_value * _TIME_UNITS[time_unit], f"{time_value}{time_unit}", _TIME_STEPS[time_unit]
+
+# Static analysis instructions. Kept byte-identical across calls so Bedrock's
+# prompt caching can reuse the processed prefix instead of re-reading it.
+_ANALYSIS_INSTRUCTIONS = """I need you to analyze logs from our microservice architecture and provide insights.
+
+For this analysis, please:
+1. Summarize the main errors and issues
+2. Identify which services are most affected
+3. Detect any patterns in when or how errors occur
+4. Suggest potential root causes
+5. Recommend specific places in the code or systems to investigate
+6. List any related trace IDs that might be helpful for further investigation
+
+Present your findings in a clear, structured format that would help an on-call engineer quickly understand and address the issues."""
+
+
+# Pre-built prompt pieces: the static text around the serialized logs never
+# changes, so the per-call work is two concatenations with logs_json
+_DYNAMIC_BLOCK_PREFIX = "Here are the logs to analyze:\n\n```json\n"
+_DYNAMIC_BLOCK_SUFFIX = "\n```"
+_PROMPT_PREFIX = _ANALYSIS_INSTRUCTIONS + "\n\n" + _DYNAMIC_BLOCK_PREFIX
+
+# Column layout of the Kubernetes log frame
+_LOG_COLUMNS = ['timestamp', 'pod', 'namespace', 'message', 'app']
+
+# Fields worth sending to the model; anything else (e.g. the raw Prometheus
+# label dict, which is already baked into the message) is dropped before
+# serialization to save input tokens. Messages are also capped per record.
+_PROMPT_LOG_FIELDS = ("timestamp", "pod", "namespace", "app", "metric", "value", "message")
+_PROMPT_MESSAGE_MAX_CHARS = 500
+
+# Byte budget for the serialized log payload (~4 bytes/token, so roughly
+# 30K tokens of logs), and a hard ceiling on entries even when each is tiny
+_PROMPT_MAX_BYTES = 120_000
+_PROMPT_MAX_ENTRIES = 1000
+
+# Ceiling on map-reduce shards and on concurrent shard calls - the fan-out
+# has to stay under Bedrock's request rate limits
+_MAX_SHARDS = 8
+_MAX_SHARD_WORKERS = 4
+
+
+class _TokenBucket:
+    """
+    Thread-safe token bucket: callers take one token per request, and tokens
+    refill continuously at `rate` per second up to `capacity`. Short bursts
+    go through at full speed while sustained load is capped - unlike a fixed
+    per-request sleep, which throttles even a healthy server.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity,
+                                   self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+def _slim_log_records(logs: Union[pd.DataFrame, List[Dict]]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Project each record down to the fields the model actually uses,
+    truncating long messages, and keep adding entries until the serialized
+    payload reaches the byte budget. Capping on bytes rather than a fixed
+    entry count means verbose entries cannot overflow the context while
+    compact ones no longer leave the prompt under-filled.
+
+    Returns:
+        Tuple of (kept raw records, slimmed records for serialization)
+    """
+    if isinstance(logs, pd.DataFrame):
+        log_records = logs.iloc[:_PROMPT_MAX_ENTRIES].to_dict('records')
+    else:
+        log_records = logs[:_PROMPT_MAX_ENTRIES]
+    kept_records = []
+    slim_records = []
+    used_bytes = 2  # the enclosing JSON array brackets
+    for record in log_records:
+        entry = {k: record[k] for k in _PROMPT_LOG_FIELDS if record.get(k) is not None}
+        message = entry.get("message")
+        if message and len(message) > _PROMPT_MESSAGE_MAX_CHARS:
+            entry["message"] = message[:_PROMPT_MESSAGE_MAX_CHARS] + "...[truncated]"
+        entry_bytes = len(_json_dumps_compact(entry).encode('utf-8')) + 1  # +1 for the comma
+        if slim_records and used_bytes + entry_bytes > _PROMPT_MAX_BYTES:
+            break
+        used_bytes += entry_bytes
+        kept_records.append(record)
+        slim_records.append(entry)
+    return kept_records, slim_records
+
+
+def _empty_logs_frame() -> pd.DataFrame:
+    """Empty log frame with the standard column layout."""
+    return pd.DataFrame(columns=_LOG_COLUMNS)
+
+
+def _prompt_content(dynamic_text: str) -> List[Dict]:
+    """Build a Claude content array with the static instruction prefix marked
+    cacheable via cache_control, followed by the changing log payload."""
+    return [
+        {
+            "type": "text",
+            "text": _ANALYSIS_INSTRUCTIONS,
+            "cache_control": {"type": "ephemeral"}
+        },
+        {"type": "text", "text": dynamic_text},
+    ]
+
+# Level tokens in priority order (error beats warning beats info beats debug,
+# matching the original elif chain).
+_LEVEL_TOKENS = [
+    ("error", ("ERROR", "ERRO", "ERR", "FATAL")),
+    ("warning", ("WARNING", "WARN")),
+    ("info", ("INFO",)),
+    ("debug", ("DEBUG",)),
+]
+_LEVEL_TOKEN_MAP = dict(_LEVEL_TOKENS)
+
+# Lowercased bytes mirrors of the level tokens, for filtering streamed log
+# lines before they are decoded - discarded lines (the vast majority with a
+# log_type filter) never pay the UTF-8 decode, and lowercase tokens let the
+# level scan share one case fold with the message_contains filter.
+_LEVEL_TOKENS_B = [(level, tuple(token.lower().encode('ascii') for token in tokens))
+                   for level, tokens in _LEVEL_TOKENS]
+_LEVEL_TOKEN_MAP_B = dict(_LEVEL_TOKENS_B)
+
+
+def _is_word_boundary_b(folded: bytes, start: int, end: int) -> bool:
+    """Check that folded[start:end] is not embedded in a larger word."""
+    if start > 0:
+        before = folded[start - 1:start]
+        if before.isalnum() or before == b'_':
+            return False
+    if end < len(folded):
+        after = folded[end:end + 1]
+        if after.isalnum() or after == b'_':
+            return False
+    return True
+
+
+def _contains_token_b(folded: bytes, token: bytes) -> bool:
+    """Whole-word substring search over an already case-folded bytes line."""
+    start = folded.find(token)
+    while start != -1:
+        if _is_word_boundary_b(folded, start, start + len(token)):
+            return True
+        start = folded.find(token, start + 1)
+    return False
+
+
+def _detect_log_level_b(lower: bytes, log_type: Optional[str] = None) -> Optional[str]:
+    """Detect the log level of an already ASCII-lowercased, undecoded line.
+
+    The caller folds the line once and shares it with the message filter.
+    When log_type is given, lines missing that level's tokens are rejected
+    up front (the common case under a filter); lines that do carry them
+    still go through the priority scan (error > warning > info > debug), so
+    a line containing both "INFO" and "error" detects as "error" exactly
+    like the original elif chain and is dropped by an info filter.
+    """
+    if log_type:
+        tokens = _LEVEL_TOKEN_MAP_B.get(log_type, ())
+        if not any(_contains_token_b(lower, token) for token in tokens):
+            return None
+    for level, tokens in _LEVEL_TOKENS_B:
+        if any(_contains_token_b(lower, token) for token in tokens):
+            return level
+    return None
+
+
+def _process_log_line(line: bytes,
+                      needle_b: Optional[bytes],
+                      log_type: Optional[str]) -> Optional[Tuple[Optional[str], str]]:
+    """Filter one undecoded log line shared by the sync and async fetchers.
+
+    Returns (timestamp_iso, message) for lines that pass the filters, None
+    for lines to drop. Only surviving lines are decoded.
+    """
+    line = line.rstrip(b'\n')
+    if not line.strip():
+        return None
+
+    # Extract timestamp if possible. The expected prefix is fixed-width ISO
+    # (YYYY-MM-DDTHH:MM:SS), so a handful of slice checks replace a regex
+    # engine entry on every line.
+    timestamp = None
+    message = line
+
+    if (len(line) >= 19 and line[4:5] == b'-' and line[7:8] == b'-'
+            and line[10:11] == b'T' and line[13:14] == b':' and line[16:17] == b':'):
+        try:
+            timestamp = datetime.fromisoformat(line[:19].decode('ascii'))
+            # Remove timestamp from the message
+            message = line[19:].strip()
+        except (ValueError, UnicodeDecodeError):
+            # Keep the original message if timestamp parsing fails
+            pass
+
+    # One case fold per line, shared by the substring filter and the level
+    # scan; the cheap substring check still runs first
+    lower = message.lower()
+    if needle_b and needle_b not in lower:
+        return None
+
+    # Apply log type filter if specified (look for common patterns)
+    if log_type and _detect_log_level_b(lower, log_type) != log_type:
+        return None
+
+    return timestamp.isoformat() if timestamp else None, message.decode('utf-8', 'replace')
+
 
 class LogExplorer:
     def __init__(self, region=None, profile_arn=None, disable_ssl_verify=False):
@@ -32,27 +355,161 @@ class LogExplorer:
             "arn:aws:bedrock:eu-west-1:951719175506:inference-profile/eu.anthropic.claude-3-7-sonnet-20250219-v1:0")
         self.disable_ssl_verify = disable_ssl_verify
         
-        # Set the Claude model ID
-        self.model_id = "eu.anthropic.claude-3-7-sonnet-20250219-v1:0"
-        
+        # Set the Claude model ID, preferring a recently-verified id from the
+        # on-disk model cache so hot starts skip discovery entirely
+        self.model_id = self._load_cached_model_id() or "eu.anthropic.claude-3-7-sonnet-20250219-v1:0"
+
+        # Shared HTTP session with pooled keep-alive connections - Prometheus
+        # queries and custom Bedrock calls reuse sockets instead of paying a
+        # fresh TCP+TLS handshake per request.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        # Larger botocore pool so Bedrock calls also reuse connections, with
+        # explicit timeouts and bounded retries so a dead endpoint fails fast
+        self._boto_config = botocore.config.Config(
+            retries={"max_attempts": 2, "mode": "standard"},
+            connect_timeout=3,
+            read_timeout=60,
+            max_pool_connections=50,
+        )
+
+        # Kubernetes client, built lazily and reused across fetches
+        self._core_api = None
+
+        # Rate limiter shared by the parallel Prometheus queries - protects
+        # the server from sustained load without a per-request sleep
+        self._prom_bucket = _TokenBucket(rate=10, capacity=10)
+
+        # On-disk cache of Bedrock responses. Analysis prompts repeat across
+        # invocations during iterative debugging (same app, same window, same
+        # filters) and the analysis is effectively deterministic, so serving
+        # repeats from cache skips the LLM call entirely. The connection is
+        # shared across the worker threads used by the batched/async paths,
+        # so same-thread checking is off and a lock serializes access.
+        self._cache_lock = threading.Lock()
+        try:
+            self._cache = sqlite3.connect(os.path.expanduser('~/.log_explorer_cache.db'),
+                                          check_same_thread=False)
+            self._cache.execute(
+                "CREATE TABLE IF NOT EXISTS bedrock_cache (key TEXT PRIMARY KEY, response TEXT, ts INTEGER)"
+            )
+            self._cache.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: could not open response cache: {str(e)}")
+            self._cache = None
+
         # Create the Bedrock client using environment credentials when available
         try:
-            session = boto3.Session(region_name=self.region)
-            self.bedrock_client = session.client("bedrock-runtime")
+            self.bedrock_client = _BOTO_SESSION.client(
+                "bedrock-runtime", region_name=self.region, config=self._boto_config
+            )
             print(f"Successfully initialized Bedrock client in region: {self.region}")
         except Exception as e:
             print(f"Warning: Error initializing standard Bedrock client: {str(e)}")
             print("Falling back to direct boto3 client...")
             self.bedrock_client = boto3.client(
-                service_name="bedrock-runtime", 
-                region_name=self.region
+                service_name="bedrock-runtime",
+                region_name=self.region,
+                config=self._boto_config
             )
         
-        # Test the AWS Bedrock connection
-        self.test_bedrock_connection()
-        
+        # Snapshot the env vars the error diagnostics report, read once here
+        # instead of on every failed analysis
+        self._debug_env = {
+            name: os.environ.get(name)
+            for name in ("AWS_REGION", "AWS_BEDROCK_INFERENCE_PROFILE",
+                         "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN")
+        }
+
+        # Defer the Bedrock connection test until the first real invocation -
+        # it costs a full invoke_model round-trip, which short-lived CLI runs
+        # should not pay up front
+        self._connection_tested = False
+
+        # Whether latency-optimized inference is available for this model/
+        # region; flipped off after the SDK or the service rejects it so
+        # later calls skip the doomed attempt
+        self._latency_optimized = True
+
+    def _ensure_connection(self):
+        """Run the Bedrock connection test once, on first use."""
+        if not self._connection_tested:
+            self.test_bedrock_connection()
+
+    def _load_cached_model_id(self) -> Optional[str]:
+        """Return the cached working model id if the cache file is fresh."""
+        try:
+            with open(_MODEL_CACHE_PATH) as f:
+                entry = json.load(f)
+            if time.time() - entry.get("ts", 0) > _MODEL_CACHE_TTL_SECONDS:
+                return None
+            return entry.get("model_id") or None
+        except (OSError, ValueError):
+            return None
+
+    def _save_cached_model_id(self):
+        """Persist the current model id so later runs skip discovery."""
+        try:
+            os.makedirs(os.path.dirname(_MODEL_CACHE_PATH), exist_ok=True)
+            with open(_MODEL_CACHE_PATH, "w") as f:
+                json.dump({"model_id": self.model_id, "ts": int(time.time())}, f)
+        except OSError as e:
+            logger.debug("Could not write model cache: %s", str(e))
+
+    def _invalidate_cached_model_id(self):
+        """Drop the cached model id (e.g. after a runtime validation error)."""
+        try:
+            os.remove(_MODEL_CACHE_PATH)
+        except OSError:
+            pass
+
+    def _reprobe_model(self) -> bool:
+        """
+        Probe the fallback model ids in parallel and adopt the first one
+        that answers. The result is persisted to the model cache so
+        subsequent runs start on the working model directly.
+
+        Returns:
+            True if a working model was found
+        """
+        print("Probing fallback models in parallel...")
+        found = None
+
+        def _probe_model(model):
+            return self.bedrock_client.converse(
+                modelId=model,
+                messages=[{"role": "user", "content": [{"text": "Say hello"}]}],
+                inferenceConfig={"maxTokens": 10},
+            )
+
+        # Each probe is a full network round-trip, so serial probing would
+        # pay (N-1) extra latencies on the failure path. First success wins.
+        with ThreadPoolExecutor(max_workers=len(_FALLBACK_MODELS)) as executor:
+            futures = {executor.submit(_probe_model, model): model
+                       for model in _FALLBACK_MODELS}
+            for future in as_completed(futures):
+                model = futures[future]
+                try:
+                    future.result()
+                except Exception as me:
+                    print(f"✗ Failed with model {model}: {str(me)}")
+                    continue
+                if found is None:
+                    print(f"✓ Successful with model: {model}")
+                    found = model
+
+        if found is None:
+            return False
+        self.model_id = found
+        self._save_cached_model_id()
+        return True
+
     def test_bedrock_connection(self):
         """Test the connection to AWS Bedrock and list available models."""
+        self._connection_tested = True
         try:
             print("\n=== Testing AWS Bedrock Connection ===")
             print(f"Using Claude model ID: {self.model_id}")
@@ -129,10 +586,12 @@ class LogExplorer:
                         return
                 
                 # Check if response is valid
-                response_body = json.loads(response['body'].read().decode())
+                response_body = _json_loads(response['body'].read())
                 if 'content' in response_body and len(response_body['content']) > 0:
                     print("✓ AWS Bedrock connection test successful!")
                     print(f"Response: {response_body['content'][0]['text'][:50]}...")
+                    # Remember the verified model so later runs skip discovery
+                    self._save_cached_model_id()
                 else:
                     print(f"⚠ Unexpected response format: {response_body}")
             except Exception as e:
@@ -144,29 +603,121 @@ class LogExplorer:
             print(f"✗ AWS Bedrock connection test failed: {str(e)}")
             print("Will continue but analysis functionality may not work properly.")
     
-    def custom_bedrock_invoke(self, prompt, max_tokens=4096):
+    def _get_core_api(self):
+        """Return a cached Kubernetes CoreV1Api client, building it on first use.
+
+        Loading ~/.kube/config re-parses YAML and rebuilds the TLS context;
+        the resulting client is reusable, so pay that cost once per process.
+        """
+        if self._core_api is not None:
+            return self._core_api
+
+        # Load kube config (from ~/.kube/config by default)
+        if self.disable_ssl_verify:
+            print("SSL verification disabled for Kubernetes API calls")
+            # Create a configuration with SSL verification disabled
+            configuration = client.Configuration()
+            configuration.verify_ssl = False
+            configuration.debug = False
+
+            try:
+                config.load_kube_config(client_configuration=configuration)
+                client.Configuration.set_default(configuration)
+                self._core_api = client.CoreV1Api()
+            except Exception as e:
+                raise Exception(f"Failed to initialize Kubernetes client with SSL verification disabled: {str(e)}")
+        else:
+            try:
+                config.load_kube_config()
+                self._core_api = client.CoreV1Api()
+            except Exception as e:
+                print(f"Error loading default kubeconfig: {str(e)}")
+                print("Trying with SSL verification disabled...")
+
+                # Create a configuration with SSL verification disabled
+                configuration = client.Configuration()
+                configuration.verify_ssl = False
+                configuration.debug = False
+
+                # Try to load kube config with the custom configuration
+                try:
+                    config.load_kube_config(client_configuration=configuration)
+                    client.Configuration.set_default(configuration)
+                    self._core_api = client.CoreV1Api()
+                except Exception as load_err:
+                    raise Exception(f"Failed to initialize Kubernetes client: {str(load_err)}")
+
+        return self._core_api
+
+    def _cache_key(self, prompt, max_tokens):
+        """Deterministic cache key for a Bedrock invocation."""
+        return hashlib.sha256(f"{self.model_id}|{max_tokens}|{prompt}".encode()).hexdigest()
+
+    def _cache_get(self, key):
+        """Return a cached response for the key, or None on miss/expiry."""
+        if not self._cache:
+            return None
+        try:
+            with self._cache_lock:
+                row = self._cache.execute(
+                    "SELECT response FROM bedrock_cache WHERE key = ? AND ts > ?",
+                    (key, int(time.time()) - _CACHE_TTL_SECONDS)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def _cache_put(self, key, response_text):
+        """Store a Bedrock response under the key."""
+        if not self._cache:
+            return
+        try:
+            with self._cache_lock:
+                self._cache.execute(
+                    "INSERT OR REPLACE INTO bedrock_cache (key, response, ts) VALUES (?, ?, ?)",
+                    (key, response_text, int(time.time()))
+                )
+                self._cache.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: could not write to response cache: {str(e)}")
+
+    def custom_bedrock_invoke(self, prompt, max_tokens=4096, content=None):
         """
         Custom method to invoke AWS Bedrock Claude models using requests directly.
         This is a fallback for when boto3 doesn't support the desired model ID.
-        
+
         Args:
             prompt: The prompt to send to Claude
             max_tokens: Maximum number of tokens in the response
-            
+            content: Optional structured content blocks (e.g. with cache_control)
+                to send instead of the plain prompt string
+
         Returns:
             The analysis text from Claude
+
+        Raises:
+            RuntimeError: if the call fails for any reason (bad status code,
+                unexpected payload, missing requests_aws4auth) - failures
+                must never be mistaken for analysis text or cached
         """
+        # Serve repeated prompts from the on-disk cache
+        cache_key = self._cache_key(prompt, max_tokens)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            print("Using cached Bedrock response (skipping API call)")
+            return cached
+
         try:
             print("\nAttempting custom AWS Bedrock API call...")
-            
+
             # Try to use requests library for direct API call
             import requests
             from requests_aws4auth import AWS4Auth
             
-            # Get AWS credentials from boto3
-            session = boto3.Session(region_name=self.region)
-            credentials = session.get_credentials()
-            
+            # Get AWS credentials from the shared session - the provider
+            # chain was already resolved once at import
+            credentials = _BOTO_SESSION.get_credentials()
+
             # Create the auth handler
             auth = AWS4Auth(
                 credentials.access_key,
@@ -186,41 +737,42 @@ class LogExplorer:
             # Prepare the request body
             body = {
                 "anthropic_version": "bedrock-2023-05-31",
+                "anthropic_beta": ["prompt-caching-2024-07-31"],
                 "max_tokens": max_tokens,
                 "messages": [
                     {
                         "role": "user",
-                        "content": prompt
+                        "content": content if content is not None else prompt
                     }
                 ]
             }
             
             # Send the request
             print(f"Sending request to: {url}")
-            response = requests.post(url, auth=auth, headers=headers, json=body)
+            response = self._session.post(url, auth=auth, headers=headers, json=body)
             
             # Check the response
-            if response.status_code == 200:
-                result = response.json()
-                if 'content' in result and len(result['content']) > 0:
-                    return result['content'][0]['text']
-                else:
-                    return f"Unexpected response format: {result}"
-            else:
-                return f"API call failed with status code {response.status_code}: {response.text}"
-                
+            if response.status_code != 200:
+                raise RuntimeError(
+                    f"API call failed with status code {response.status_code}: {response.text}")
+            result = response.json()
+            if not result.get('content'):
+                raise RuntimeError(f"Unexpected response format: {result}")
+
+            text = result['content'][0]['text']
+            self._cache_put(cache_key, text)
+            return text
+
         except ImportError:
             print("requests_aws4auth not installed. Try: pip install requests-aws4auth")
-            return "Error: Required Python packages not installed for custom API call."
-        except Exception as e:
-            return f"Custom API call failed: {str(e)}"
+            raise RuntimeError("Required Python packages not installed for custom API call.")
         
     def fetch_logs_from_kubernetes(self, 
                                   app_name: str, 
                                   time_range: str, 
                                   message_contains: Optional[str] = None, 
-                                  log_type: Optional[str] = None, 
-                                  limit: int = 500) -> List[Dict]:
+                                  log_type: Optional[str] = None,
+                                  limit: int = 500) -> pd.DataFrame:
         """
         Fetch logs from Kubernetes.
         
@@ -230,68 +782,42 @@ class LogExplorer:
             message_contains: Filter logs containing this text
             log_type: Type of logs (error, info, warn)
             limit: Maximum number of logs to fetch
-            
+
         Returns:
-            List of log entries as dictionaries
+            DataFrame of log entries with columns timestamp, pod, namespace,
+            message, app (use .to_dict('records') for list-of-dict consumers)
         """
         print(f"Fetching logs for app: {app_name}, time range: {time_range}...")
-        
-        # Parse the time range
-        time_value = int(time_range[:-1])
-        time_unit = time_range[-1].lower()
-        
-        if time_unit == 'h':
-            start_time = datetime.now() - timedelta(hours=time_value)
-            since_param = f"{time_value}h"
-        elif time_unit == 'd':
-            start_time = datetime.now() - timedelta(days=time_value)
-            since_param = f"{time_value}d"
-        elif time_unit == 'm':
-            start_time = datetime.now() - timedelta(minutes=time_value)
-            since_param = f"{time_value}m"
-        else:
-            raise ValueError(f"Unsupported time unit: {time_unit}. Use 'm' for minutes, 'h' for hours, 'd' for days.")
-        
-        logs = []
-        
-        try:
-            # Method 1: Try using the kubernetes client library
+
+        # Parse the time range once; the window length in seconds is all the
+        # Kubernetes API needs
+        since_seconds, _, _ = _parse_time_range(time_range)
+
+        # Prefer server-side filtering when a Loki endpoint is configured -
+        # pulling every byte just to drop most lines client-side wastes
+        # bandwidth
+        if (message_contains or log_type) and os.environ.get("LOKI_URL"):
+            print("Filters requested and LOKI_URL is set - using the Loki backend")
+            return self.fetch_logs_from_loki(
+                app_name, time_range,
+                message_contains=message_contains, log_type=log_type, limit=limit
+            )
+
+        logs = _empty_logs_frame()
+
+        # Retry the Python client with exponential backoff rather than forking
+        # kubectl - the client gives per-pod attribution, streaming, and
+        # threaded fetches that the kubectl stdout blob cannot.
+        attempts = 3
+        for attempt in range(attempts):
+            if attempt:
+                delay = 2 ** (attempt - 1)
+                print(f"Retrying Kubernetes fetch in {delay}s (attempt {attempt + 1}/{attempts})...")
+                time.sleep(delay)
+
             try:
-                # Load kube config (from ~/.kube/config by default)
-                if self.disable_ssl_verify:
-                    print("SSL verification disabled for Kubernetes API calls")
-                    # Create a configuration with SSL verification disabled
-                    configuration = client.Configuration()
-                    configuration.verify_ssl = False
-                    configuration.debug = False
-                    
-                    try:
-                        config.load_kube_config(client_configuration=configuration)
-                        client.Configuration.set_default(configuration)
-                        core_api = client.CoreV1Api()
-                    except Exception as e:
-                        raise Exception(f"Failed to initialize Kubernetes client with SSL verification disabled: {str(e)}")
-                else:
-                    try:
-                        config.load_kube_config()
-                        core_api = client.CoreV1Api()
-                    except Exception as e:
-                        print(f"Error loading default kubeconfig: {str(e)}")
-                        print("Trying with SSL verification disabled...")
-                        
-                        # Create a configuration with SSL verification disabled
-                        configuration = client.Configuration()
-                        configuration.verify_ssl = False
-                        configuration.debug = False
-                        
-                        # Try to load kube config with the custom configuration
-                        try:
-                            config.load_kube_config(client_configuration=configuration)
-                            client.Configuration.set_default(configuration)
-                            core_api = client.CoreV1Api()
-                        except Exception as load_err:
-                            raise Exception(f"Failed to initialize Kubernetes client: {str(load_err)}")
-                
+                core_api = self._get_core_api()
+
                 print(f"Using Kubernetes Python client to fetch logs...")
                 
                 # Get pods with the specified app label
@@ -312,157 +838,286 @@ class LogExplorer:
                     
                 print(f"Found {len(pods.items)} pods matching {selector}")
                 
-                # Fetch logs for each pod
-                for pod in pods.items[:min(20, len(pods.items))]:  # Limit to 20 pods to avoid too many requests
+                # Lowercase the needle once per call, not once per line; the
+                # bytes form filters lines before they are decoded
+                needle_b = message_contains.lower().encode('utf-8') if message_contains else None
+
+                # Bound bytes pulled per pod: without filters a pod can
+                # contribute at most `limit` lines anyway; with filters allow
+                # a generous oversampling factor for the client-side drop rate
+                tail_lines = limit * 20 if (needle_b or log_type) else limit
+
+                def _fetch_pod_logs(pod) -> Tuple[List, List, List, List]:
+                    """Fetch and filter logs for a single pod. Safe to run in a worker thread.
+
+                    Returns parallel (timestamp, pod, namespace, message) column
+                    lists rather than one dict per line - struct-of-arrays keeps
+                    per-row object overhead down and feeds a single DataFrame
+                    build after aggregation.
+                    """
+                    ts_col, pod_col, ns_col, msg_col = [], [], [], []
                     try:
                         namespace = pod.metadata.namespace
                         pod_name = pod.metadata.name
-                        
-                        # Apply log type filter if specified
-                        container_logs = ""
+
+                        # Stream the log response instead of buffering the whole
+                        # blob into one string - memory stays O(limit) and we can
+                        # stop reading from the network once the limit is hit.
                         try:
-                            container_logs = core_api.read_namespaced_pod_log(
+                            response = core_api.read_namespaced_pod_log(
                                 name=pod_name,
                                 namespace=namespace,
-                                since_seconds=int(time.time() - start_time.timestamp()),
+                                since_seconds=since_seconds,
                                 timestamps=True,
-                                container=pod.spec.containers[0].name  # Use first container by default
+                                tail_lines=tail_lines,
+                                container=pod.spec.containers[0].name,  # Use first container by default
+                                _preload_content=False,
+                                follow=False
                             )
                         except ApiException as e:
                             print(f"Error fetching logs for pod {pod_name}: {e}")
-                            continue
-                            
-                        # Process log lines
-                        for line in container_logs.split('\n'):
-                            if not line.strip():
-                                continue
-                                
-                            # Extract timestamp if possible
-                            timestamp = None
-                            message = line
-                            
-                            # Common timestamp formats in logs
-                            timestamp_match = re.search(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}', line)
-                            if timestamp_match:
-                                timestamp_str = timestamp_match.group(0)
-                                try:
-                                    timestamp = datetime.fromisoformat(timestamp_str.replace('T', ' '))
-                                    # Remove timestamp from the message
-                                    message = line[len(timestamp_str):].strip()
-                                except ValueError:
-                                    # Keep the original message if timestamp parsing fails
-                                    pass
-                            
-                            # Apply message contains filter if specified
-                            if message_contains and message_contains.lower() not in message.lower():
-                                continue
-                                
-                            # Apply log type filter if specified (look for common patterns)
-                            if log_type:
-                                log_level = None
-                                if re.search(r'\b(ERROR|ERR|ERRO|FATAL)\b', message, re.IGNORECASE):
-                                    log_level = "error"
-                                elif re.search(r'\b(WARN|WARNING)\b', message, re.IGNORECASE):
-                                    log_level = "warning"
-                                elif re.search(r'\b(INFO)\b', message, re.IGNORECASE):
-                                    log_level = "info"
-                                elif re.search(r'\b(DEBUG)\b', message, re.IGNORECASE):
-                                    log_level = "debug"
-                                
-                                if log_level != log_type:
+                            return ts_col, pod_col, ns_col, msg_col
+
+                        # Process log lines as they arrive, keeping them as
+                        # bytes through the filters - only surviving lines pay
+                        # the UTF-8 decode
+                        try:
+                            buffered = io.BufferedReader(response, buffer_size=8192)
+                            for line in buffered:
+                                entry = _process_log_line(line, needle_b, log_type)
+                                if entry is None:
                                     continue
-                            
-                            # Create log entry
-                            log_entry = {
-                                "timestamp": timestamp.isoformat() if timestamp else None,
-                                "pod": pod_name,
-                                "namespace": namespace,
-                                "message": message,
-                                "app": app_name
-                            }
-                            
-                            logs.append(log_entry)
-                            
-                            # Stop if we've reached the limit
-                            if len(logs) >= limit:
-                                break
-                        
-                        # Stop if we've reached the limit
-                        if len(logs) >= limit:
-                            break
-                            
+
+                                # Record the log entry columns
+                                ts_col.append(entry[0])
+                                pod_col.append(pod_name)
+                                ns_col.append(namespace)
+                                msg_col.append(entry[1])
+
+                                # Stop once this pod alone could satisfy the limit
+                                if len(msg_col) >= limit:
+                                    break
+                        finally:
+                            response.release_conn()
+
                     except Exception as e:
                         print(f"Error processing logs for pod {pod.metadata.name}: {str(e)}")
+
+                    return ts_col, pod_col, ns_col, msg_col
+
+                if _HAS_ASYNC_K8S and len(pods.items) > 20:
+                    # Beyond the threaded pod cap, fan out on an event loop -
+                    # one socket per pod instead of a blocked thread, so no
+                    # pods need to be dropped
+                    print(f"Streaming {len(pods.items)} pods via kubernetes_asyncio...")
+                    timestamps, pod_names, namespaces, messages = asyncio.run(
+                        self._fetch_logs_async(pods.items, since_seconds, needle_b, log_type, limit)
+                    )
+                else:
+                    # Fetch logs for all pods in parallel - each fetch is a blocking
+                    # HTTPS round-trip, so threads give near-Nx speedup for N pods.
+                    # The kubernetes client is thread-safe for read calls, so a single
+                    # core_api instance is shared across workers.
+                    selected_pods = pods.items[:min(20, len(pods.items))]  # Limit to 20 pods to avoid too many requests
+                    timestamps, pod_names, namespaces, messages = [], [], [], []
+                    with ThreadPoolExecutor(max_workers=20) as executor:
+                        for ts_col, pod_col, ns_col, msg_col in executor.map(_fetch_pod_logs, selected_pods):
+                            # One bound check per pod, not per line - once the
+                            # limit is covered, later pods' results are dropped
+                            # without being copied into the columns
+                            if len(messages) >= limit:
+                                break
+                            timestamps.extend(ts_col)
+                            pod_names.extend(pod_col)
+                            namespaces.extend(ns_col)
+                            messages.extend(msg_col)
+
+                # Enforce the limit after aggregation, then build the frame in
+                # one shot from the column lists
+                logs = pd.DataFrame({
+                    'timestamp': timestamps[:limit],
+                    'pod': pod_names[:limit],
+                    'namespace': namespaces[:limit],
+                    'message': messages[:limit],
+                    'app': [app_name] * min(len(messages), limit)
+                })
                 
             except (config.config_exception.ConfigException, ApiException) as e:
+                # Transient API/config errors are worth another attempt
                 print(f"Error using Kubernetes client library: {str(e)}")
-                print("Falling back to kubectl command...")
-                
-                # Method 2: Fall back to kubectl command
-                try:
-                    # Build kubectl command
-                    kubectl_cmd = ["kubectl", "logs", "-l", f"app={app_name}", f"--since={since_param}"]
-                    
-                    # Add namespace if specified
-                    # kubectl_cmd.extend(["-n", namespace])  # Uncomment and add namespace parameter if needed
-                    
-                    # Add tail limit
-                    kubectl_cmd.extend(["--tail", str(limit)])
-                    
-                    print(f"Executing: {' '.join(kubectl_cmd)}")
-                    
-                    # Execute kubectl command
-                    result = subprocess.run(kubectl_cmd, capture_output=True, text=True, check=False)
-                    
-                    if result.returncode != 0:
-                        print(f"kubectl command failed: {result.stderr}")
-                        return logs
-                        
-                    # Process the logs
-                    pod_logs = result.stdout.strip().split('\n')
-                    
-                    for line in pod_logs:
-                        if not line.strip():
-                            continue
-                            
-                        # Apply message contains filter if specified
-                        if message_contains and message_contains.lower() not in line.lower():
-                            continue
-                            
-                        # Apply log type filter if specified
-                        if log_type:
-                            log_level = None
-                            if re.search(r'\b(ERROR|ERR|ERRO|FATAL)\b', line, re.IGNORECASE):
-                                log_level = "error"
-                            elif re.search(r'\b(WARN|WARNING)\b', line, re.IGNORECASE):
-                                log_level = "warning"
-                            elif re.search(r'\b(INFO)\b', line, re.IGNORECASE):
-                                log_level = "info"
-                            elif re.search(r'\b(DEBUG)\b', line, re.IGNORECASE):
-                                log_level = "debug"
-                            
-                            if log_level != log_type:
-                                continue
-                        
-                        # Create log entry
-                        log_entry = {
-                            "timestamp": None,  # Timestamp extraction would require more parsing
-                            "pod": "unknown",  # Pod name is not included in the default output
-                            "message": line,
-                            "app": app_name
-                        }
-                        
-                        logs.append(log_entry)
-                except Exception as e:
-                    print(f"Error executing kubectl command: {str(e)}")
-        
-        except Exception as e:
-            print(f"Error fetching logs: {str(e)}")
-            
+            except Exception as e:
+                print(f"Error fetching logs: {str(e)}")
+                break
+            else:
+                break
+
         print(f"Fetched {len(logs)} log entries")
         return logs
     
-    def fetch_logs_from_prometheus(self, 
+    async def _fetch_logs_async(self, pods, since_seconds, needle_b, log_type, limit):
+        """Stream pod logs concurrently on a single event loop.
+
+        Uses kubernetes_asyncio so each pod costs one file descriptor instead
+        of a blocked worker thread; a semaphore bounds the concurrent streams.
+        Returns the same (timestamps, pods, namespaces, messages) column lists
+        as the threaded path.
+        """
+        configuration = async_client.Configuration()
+        await async_config.load_kube_config(client_configuration=configuration)
+        if self.disable_ssl_verify:
+            configuration.verify_ssl = False
+
+        async with async_client.ApiClient(configuration) as api_client:
+            core_api = async_client.CoreV1Api(api_client)
+            semaphore = asyncio.Semaphore(32)
+
+            # Same per-pod byte bound as the threaded path
+            tail_lines = limit * 20 if (needle_b or log_type) else limit
+
+            async def _fetch(pod):
+                ts_col, pod_col, ns_col, msg_col = [], [], [], []
+                async with semaphore:
+                    try:
+                        response = await core_api.read_namespaced_pod_log(
+                            name=pod.metadata.name,
+                            namespace=pod.metadata.namespace,
+                            since_seconds=since_seconds,
+                            timestamps=True,
+                            tail_lines=tail_lines,
+                            container=pod.spec.containers[0].name,  # Use first container by default
+                            _preload_content=False
+                        )
+                        async for line in response.content:
+                            entry = _process_log_line(line, needle_b, log_type)
+                            if entry is None:
+                                continue
+
+                            ts_col.append(entry[0])
+                            pod_col.append(pod.metadata.name)
+                            ns_col.append(pod.metadata.namespace)
+                            msg_col.append(entry[1])
+
+                            # Stop once this pod alone could satisfy the limit
+                            if len(msg_col) >= limit:
+                                break
+                    except Exception as e:
+                        print(f"Error fetching logs for pod {pod.metadata.name}: {str(e)}")
+                return ts_col, pod_col, ns_col, msg_col
+
+            results = await asyncio.gather(*[_fetch(pod) for pod in pods])
+
+        timestamps, pod_names, namespaces, messages = [], [], [], []
+        for ts_col, pod_col, ns_col, msg_col in results:
+            if len(messages) >= limit:
+                break
+            timestamps.extend(ts_col)
+            pod_names.extend(pod_col)
+            namespaces.extend(ns_col)
+            messages.extend(msg_col)
+
+        return timestamps, pod_names, namespaces, messages
+
+    def fetch_logs_from_loki(self,
+                             app_name: str,
+                             time_range: str,
+                             loki_url: Optional[str] = None,
+                             message_contains: Optional[str] = None,
+                             log_type: Optional[str] = None,
+                             limit: int = 500) -> pd.DataFrame:
+        """
+        Fetch logs from Loki with the filters pushed into the LogQL query.
+
+        Server-side filtering means non-matching lines never cross the wire,
+        which is the dominant cost when pods log far more than the user wants.
+
+        Args:
+            app_name: Name of the application to fetch logs for
+            time_range: Time range in format "1h", "2d", etc.
+            loki_url: Loki base URL (defaults to the LOKI_URL env var)
+            message_contains: Filter logs containing this text
+            log_type: Type of logs (error, info, warn)
+            limit: Maximum number of logs to fetch
+
+        Returns:
+            DataFrame of log entries with the standard column layout
+        """
+        loki_url = loki_url or os.environ.get("LOKI_URL")
+        logs = _empty_logs_frame()
+
+        if not loki_url:
+            print("LOKI_URL is not configured; cannot use the Loki backend.")
+            return logs
+
+        seconds, _, _ = _parse_time_range(time_range)
+        end_ns = int(time.time() * 1e9)
+        start_ns = end_ns - seconds * 10 ** 9
+
+        # Build the LogQL query with the filters applied server-side
+        query = f'{{app="{app_name}"}}'
+        if log_type:
+            tokens = "|".join(token.lower() for token in _LEVEL_TOKEN_MAP.get(log_type, ()))
+            query += f' |~ "(?i)\\\\b({tokens})\\\\b"'
+        if message_contains:
+            escaped = message_contains.replace('\\', '\\\\').replace('"', '\\"')
+            query += f' |= "{escaped}"'
+
+        print(f"Querying Loki: {query}")
+
+        try:
+            response = self._session.get(
+                f"{loki_url}/loki/api/v1/query_range",
+                params={
+                    'query': query,
+                    'start': start_ns,
+                    'end': end_ns,
+                    'limit': limit,
+                    'direction': 'backward',
+                },
+                verify=not self.disable_ssl_verify,
+                timeout=30
+            )
+
+            if response.status_code != 200:
+                print(f"Loki request failed with status code: {response.status_code}")
+                print(response.text)
+                return logs
+
+            data = response.json()
+            if data.get('status') != 'success':
+                print(f"Loki query failed: {data.get('error', 'unknown error')}")
+                return logs
+
+            timestamps, pod_names, namespaces, messages = [], [], [], []
+            for stream in data['data']['result']:
+                labels = stream.get('stream', {})
+                pod_name = labels.get('pod', 'unknown')
+                namespace = labels.get('namespace', 'unknown')
+
+                for ts_ns, line in stream.get('values', []):
+                    # Naive UTC, matching the Prometheus path and the UTC
+                    # timestamps Kubernetes prefixes onto streamed log lines
+                    timestamps.append(
+                        datetime.fromtimestamp(int(ts_ns) / 1e9, tz=timezone.utc)
+                        .replace(tzinfo=None).isoformat())
+                    pod_names.append(pod_name)
+                    namespaces.append(namespace)
+                    messages.append(line)
+
+            logs = pd.DataFrame({
+                'timestamp': timestamps[:limit],
+                'pod': pod_names[:limit],
+                'namespace': namespaces[:limit],
+                'message': messages[:limit],
+                'app': [app_name] * min(len(messages), limit)
+            })
+
+        except requests.RequestException as e:
+            print(f"Error querying Loki: {str(e)}")
+
+        print(f"Fetched {len(logs)} log entries from Loki")
+        return logs
+
+    def fetch_logs_from_prometheus(self,
                                   app_name: str, 
                                   time_range: str,
                                   prometheus_url: str = "http://prometheus:9090",
@@ -483,28 +1138,11 @@ class LogExplorer:
         """
         print(f"Fetching metrics from Prometheus for app: {app_name}, time range: {time_range}...")
         
-        # Parse the time range
-        time_value = int(time_range[:-1])
-        time_unit = time_range[-1].lower()
-        
-        # Calculate start and end times
+        # Parse the time range once and derive the query window from it
+        seconds, duration, step = _parse_time_range(time_range)
         end_time = int(time.time())
-        
-        if time_unit == 'h':
-            duration = f"{time_value}h"
-            start_time = end_time - time_value * 3600
-            step = "1m"  # 1 minute resolution for hours
-        elif time_unit == 'd':
-            duration = f"{time_value * 24}h"
-            start_time = end_time - time_value * 86400
-            step = "1h"  # 1 hour resolution for days
-        elif time_unit == 'm':
-            duration = f"{time_value}m"
-            start_time = end_time - time_value * 60
-            step = "15s"  # 15 seconds resolution for minutes
-        else:
-            raise ValueError(f"Unsupported time unit: {time_unit}. Use 'm' for minutes, 'h' for hours, 'd' for days.")
-        
+        start_time = end_time - seconds
+
         logs = []
         
         try:
@@ -552,250 +1190,602 @@ class LogExplorer:
                     'query': f'sum(rate(container_cpu_usage_seconds_total{{container="{app_name}"}}[5m])) by (pod)'
                 })
             
-            # Fetch each metric query
-            for query_def in queries:
-                query_name = query_def['name']
-                query = query_def['query']
-                
-                # Construct the query parameters
-                query_params = {
-                    'query': query,
-                    'start': start_time,
-                    'end': end_time,
-                    'step': step,
-                }
-                
-                try:
-                    print(f"Querying Prometheus: {query}")
-                    
-                    # Make the API call to Prometheus, with SSL verification disabled if needed
-                    verify_ssl = not self.disable_ssl_verify
-                    response = requests.get(
-                        f"{prometheus_url}/api/v1/query_range", 
-                        params=query_params,
-                        verify=verify_ssl
-                    )
-                    
-                    # Check if the request was successful
-                    if response.status_code == 200:
-                        data = response.json()
-                        if data['status'] == 'success':
-                            result = data['data']['result']
-                            
-                            # Process the results
-                            for series in result:
-                                metric = series['metric']
-                                values = series['values']
-                                
-                                # Create a more readable metric name
-                                metric_str = ", ".join([f"{k}={v}" for k, v in metric.items() if k != '__name__'])
-                                
-                                # Process each data point
-                                for timestamp, value in values:
-                                    # Convert timestamp to datetime
-                                    dt = datetime.fromtimestamp(timestamp)
-                                    
-                                    # Skip if the value is None or NaN
-                                    if value is None or value == 'NaN':
-                                        continue
-                                        
-                                    # Format the message
-                                    message = f"{query_name}: {metric_str} = {value}"
-                                    
-                                    # Apply message contains filter if specified
-                                    if message_contains and message_contains.lower() not in message.lower():
+            # Fire the metric queries concurrently - they are independent, so
+            # total wall time is roughly that of the slowest single query
+            # instead of the sum of all of them.
+            verify_ssl = not self.disable_ssl_verify
+            needle = message_contains.lower() if message_contains else None
+
+            def _run_query(query_def):
+                # Pace the fan-out: bursts up to the bucket capacity go out
+                # immediately, sustained load stays under 10 QPS
+                self._prom_bucket.acquire()
+                print(f"Querying Prometheus: {query_def['query']}")
+                return self._session.get(
+                    f"{prometheus_url}/api/v1/query_range",
+                    params={
+                        'query': query_def['query'],
+                        'start': start_time,
+                        'end': end_time,
+                        'step': step,
+                    },
+                    verify=verify_ssl,
+                    timeout=30
+                )
+
+            with ThreadPoolExecutor(max_workers=min(8, len(queries))) as executor:
+                futures = {executor.submit(_run_query, query_def): query_def
+                           for query_def in queries}
+
+                for future in as_completed(futures):
+                    query_name = futures[future]['name']
+
+                    try:
+                        response = future.result()
+
+                        # Check if the request was successful
+                        if response.status_code == 200:
+                            data = response.json()
+                            if data['status'] == 'success':
+                                result = data['data']['result']
+
+                                # Process the results
+                                for series in result:
+                                    metric = series['metric']
+                                    values = series['values']
+
+                                    if not values:
                                         continue
-                                    
-                                    # Create the log entry
-                                    log_entry = {
-                                        "timestamp": dt.isoformat(),
-                                        "metric": query_name,
-                                        "labels": metric,
-                                        "value": value,
-                                        "message": message,
-                                        "app": app_name
-                                    }
-                                    
-                                    logs.append(log_entry)
+
+                                    # Create a more readable metric name
+                                    metric_str = ", ".join([f"{k}={v}" for k, v in metric.items() if k != '__name__'])
+
+                                    # Convert all timestamps for the series in
+                                    # one vectorized pandas call instead of a
+                                    # datetime object per data point. Naive
+                                    # UTC, like the Kubernetes and Loki paths.
+                                    ts_arr = np.asarray([ts for ts, _ in values], dtype='float64')
+                                    ts_iso = (pd.to_datetime(ts_arr, unit='s', utc=True).tz_convert(None)
+                                              .strftime('%Y-%m-%dT%H:%M:%S').tolist())
+
+                                    # Pre-format the constant part of the message
+                                    prefix = f"{query_name}: {metric_str} = "
+                                    prefix_hit = needle is not None and needle in prefix.lower()
+
+                                    logs.extend(
+                                        {
+                                            "timestamp": ts,
+                                            "metric": query_name,
+                                            "labels": metric,
+                                            "value": value,
+                                            "message": f"{prefix}{value}",
+                                            "app": app_name
+                                        }
+                                        for ts, (_, value) in zip(ts_iso, values)
+                                        # Skip None/NaN points and apply the message filter
+                                        if value is not None and value != 'NaN'
+                                        and (needle is None or prefix_hit or needle in str(value).lower())
+                                    )
+                            else:
+                                print(f"Prometheus query failed: {data['error']}")
                         else:
-                            print(f"Prometheus query failed: {data['error']}")
-                    else:
-                        print(f"Prometheus request failed with status code: {response.status_code}")
-                        print(response.text)
-                        
-                except requests.RequestException as e:
-                    print(f"Error querying Prometheus: {str(e)}")
-                
-                # Sleep briefly to avoid overwhelming the Prometheus server
-                time.sleep(0.1)
-                
+                            print(f"Prometheus request failed with status code: {response.status_code}")
+                            print(response.text)
+
+                    except requests.RequestException as e:
+                        print(f"Error querying Prometheus: {str(e)}")
+
         except Exception as e:
             print(f"Error fetching metrics from Prometheus: {str(e)}")
             
         print(f"Fetched {len(logs)} metrics from Prometheus")
         return logs
 
-    def analyze_logs(self, logs: List[Dict]) -> str:
+    def _converse_analysis(self, dynamic_block: str, stream: bool = True) -> str:
+        """
+        Run one analysis round-trip over the Converse streaming API.
+
+        Shared by analyze_logs and analyze_logs_text, so every analysis
+        call gets the uniform Converse envelope, the cachePoint prefix and
+        the inference-profile routing. Raises on failure (including an
+        empty stream) so callers can fall back to custom_bedrock_invoke.
+
+        Args:
+            dynamic_block: The pre-built log payload portion of the prompt
+            stream: Print text deltas to the terminal as they arrive
+
+        Returns:
+            String containing the analysis results
+        """
+        # Route through the inference profile when one is configured -
+        # Bedrock accepts profile ARNs directly in modelId, and the
+        # provisioned/cross-region path has lower, more predictable
+        # latency than on-demand. Fall back to the plain model id.
+        model_for_invoke = self.profile_arn or self.model_id
+        logger.debug("Analyzing logs with model: %s", model_for_invoke)
+        # Converse API: uniform message envelope across Claude versions,
+        # native inference-profile support, and no hand-built
+        # anthropic_version body or hand-parsed content array. The
+        # cachePoint marks the static instructions as a cacheable prefix
+        # (the Converse equivalent of _prompt_content's cache_control).
+        invoke_args = {
+            "modelId": model_for_invoke,
+            "system": [
+                {"text": _ANALYSIS_INSTRUCTIONS},
+                {"cachePoint": {"type": "default"}},
+            ],
+            "messages": [
+                {"role": "user", "content": [{"text": dynamic_block}]}
+            ],
+            "inferenceConfig": {"maxTokens": 4096},
+        }
+        if self._latency_optimized:
+            # Request Bedrock's latency-optimized inference path; regions
+            # or SDK versions without support fall back below
+            invoke_args["performanceConfig"] = {"latency": "optimized"}
+
+        # Stream the response so the first tokens reach the terminal
+        # at first-token latency instead of full-completion latency
+        logger.debug("Attempting boto3 converse_stream...")
+        try:
+            response = self.bedrock_client.converse_stream(**invoke_args)
+        except botocore.exceptions.ParamValidationError:
+            # Older botocore without performanceConfig or cachePoint
+            # support - retry with the plain argument set
+            logger.debug("performanceConfig/cachePoint not supported by this SDK; retrying without them...")
+            invoke_args.pop("performanceConfig", None)
+            invoke_args["system"] = [{"text": _ANALYSIS_INSTRUCTIONS}]
+            self._latency_optimized = False
+            response = self.bedrock_client.converse_stream(**invoke_args)
+        except botocore.exceptions.ClientError as ce:
+            # Service-side rejection: models/regions without latency-
+            # optimized inference answer with a ValidationException.
+            # Strip the option, remember, and stay on converse_stream.
+            if ("performanceConfig" not in invoke_args
+                    or ce.response.get('Error', {}).get('Code') != 'ValidationException'):
+                raise
+            logger.debug("Latency-optimized inference not available here; retrying without it...")
+            invoke_args.pop("performanceConfig", None)
+            self._latency_optimized = False
+            response = self.bedrock_client.converse_stream(**invoke_args)
+
+        # Print text deltas as they arrive, accumulating them for the
+        # cache and the saved report
+        parts = []
+        for event in response['stream']:
+            delta_text = event.get('contentBlockDelta', {}).get('delta', {}).get('text', '')
+            if delta_text:
+                parts.append(delta_text)
+                if stream:
+                    print(delta_text, end="", flush=True)
+        if stream:
+            print()
+
+        if not parts:
+            raise RuntimeError("Claude returned an empty response stream.")
+        return "".join(parts)
+
+    def analyze_logs(self, logs: Union[pd.DataFrame, List[Dict]], stream: bool = True) -> str:
         """
         Analyze logs using Claude 3.7 Sonnet to generate insights.
-        
+
         Args:
-            logs: List of log entries
-            
+            logs: Log entries as a DataFrame or a list of dictionaries
+            stream: Print the analysis to the terminal as it generates.
+                Concurrent callers (the batched/async paths) pass False so
+                their outputs do not interleave on stdout.
+
         Returns:
             String containing the analysis results
         """
-        if not logs:
+        if logs is None or len(logs) == 0:
             return "No logs found to analyze."
-        
-        # Prepare logs for Claude
-        logs_json = json.dumps(logs[:200], indent=2)  # Limit to 200 logs to stay within context limits
-        
-        # Create the prompt for Claude
-        prompt = f"""
-        I need you to analyze these logs from our microservice architecture and provide insights:
-
-        ```json
-        {logs_json}
-        ```
-
-        For this analysis, please:
-        1. Summarize the main errors and issues
-        2. Identify which services are most affected
-        3. Detect any patterns in when or how errors occur
-        4. Suggest potential root causes
-        5. Recommend specific places in the code or systems to investigate
-        6. List any related trace IDs that might be helpful for further investigation
-        
-        Present your findings in a clear, structured format that would help an on-call engineer quickly understand and address the issues.
-        """
+
+        # Prepare logs for Claude - only the capped slice of the columnar
+        # frame is converted back to per-row dicts for serialization
+        log_records, slim_records = _slim_log_records(logs)
+
+        # Map-reduce path: if the budget dropped part of the log set, shard
+        # it and summarize the shards in parallel instead of losing the tail
+        if len(slim_records) < len(logs):
+            return self._analyze_sharded(logs, stream=stream)
+        # Compact separators: indentation was ~30-50% whitespace that still
+        # counted as input tokens (and serializer time)
+        logs_json = _json_dumps_compact(slim_records)  # Capped by byte budget in _slim_log_records
+
+        # Static instructions go first (cacheable prefix), the changing log
+        # payload second - see _prompt_content
+        dynamic_block = _DYNAMIC_BLOCK_PREFIX + logs_json + _DYNAMIC_BLOCK_SUFFIX
+
+        # Flattened prompt used for the response cache key and the custom fallback
+        prompt = _PROMPT_PREFIX + logs_json + _DYNAMIC_BLOCK_SUFFIX
         
         # Call Claude via AWS Bedrock
         try:
-            # Set up the invoke arguments using the model_id that was identified during initialization
-            print(f"Analyzing logs with model: {self.model_id}")
-            invoke_args = {
-                "modelId": self.model_id,  # Using the tested Claude model
-                "contentType": "application/json",
-                "accept": "application/json",
-                "body": json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 4096,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ]
-                })
-            }
-            
-            # Check if we should try to use inference profile
-            if self.profile_arn:
-                print(f"Using Bedrock inference profile: {self.profile_arn}")
-                # Since boto3 doesn't support inference profiles directly, we can try using it
-                # but be prepared for it to fail
-                try:
-                    # Add inference profile if available
-                    invoke_args["inferenceProfile"] = self.profile_arn
-                except Exception as e:
-                    print(f"Warning: Could not use inference profile: {str(e)}")
-                    print("Continuing without inference profile...")
-            
+            # Content-addressed cache check first: identical log sets hit the
+            # cache even if a fallback swapped model_id since the last run
+            content_key = hashlib.sha256(logs_json.encode('utf-8')).hexdigest()
+            cached = self._cache_get(content_key)
+            if cached is not None:
+                logger.debug("Using cached analysis for identical log set (skipping API call)")
+                if stream:
+                    print(cached)
+                return cached
+
+            # Serve repeated prompts from the on-disk cache
+            cache_key = self._cache_key(prompt, 4096)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.debug("Using cached Bedrock response (skipping API call)")
+                if stream:
+                    print(cached)
+                return cached
+
+            # First real Bedrock use: run the deferred connection test (it may
+            # also swap model_id for a working fallback, so refresh the key)
+            self._ensure_connection()
+            cache_key = self._cache_key(prompt, 4096)
+
             try:
-                # Try the standard boto3 invoke method first
-                print("Attempting standard boto3 invoke_model...")
-                response = self.bedrock_client.invoke_model(**invoke_args)
-                
-                # Parse and return response
-                try:
-                    response_body = json.loads(response['body'].read().decode())
-                    return response_body['content'][0]['text']
-                except KeyError:
-                    # Handle different response formats
-                    if 'body' in response and hasattr(response['body'], 'read'):
-                        content = response['body'].read().decode()
-                        return f"Claude response in unexpected format. Raw response: {content}"
-                    else:
-                        return f"Error parsing Claude response: {response}"
-                
+                analysis_text = self._converse_analysis(dynamic_block, stream=stream)
+                self._cache_put(cache_key, analysis_text)
+                self._cache_put(content_key, analysis_text)
+                return analysis_text
+
             except Exception as invoke_error:
                 # If standard method fails, try our custom method
                 print(f"Standard boto3 invoke failed: {str(invoke_error)}")
-                print("Attempting custom direct API call...")
-                
+                logger.debug("Attempting custom direct API call...")
+
                 # Try the custom direct API method
-                return self.custom_bedrock_invoke(prompt)
+                analysis_text = self.custom_bedrock_invoke(prompt, content=_prompt_content(dynamic_block))
+                self._cache_put(content_key, analysis_text)
+                if stream:
+                    print(analysis_text)
+                return analysis_text
             
         except Exception as e:
             error_msg = f"Error analyzing logs with Claude: {str(e)}"
             print(error_msg)
             print("Check if your AWS credentials are properly configured and have Bedrock access.")
             
-            # Print helpful debugging information
-            print("\nDebugging information:")
-            print(f"AWS_REGION: {os.environ.get('AWS_REGION', 'Not set')}")
-            print(f"AWS_BEDROCK_INFERENCE_PROFILE: {os.environ.get('AWS_BEDROCK_INFERENCE_PROFILE', 'Not set')}")
-            print(f"AWS_ACCESS_KEY_ID: {'Set' if os.environ.get('AWS_ACCESS_KEY_ID') else 'Not set'}")
-            print(f"AWS_SECRET_ACCESS_KEY: {'Set' if os.environ.get('AWS_SECRET_ACCESS_KEY') else 'Not set'}")
-            print(f"AWS_SESSION_TOKEN: {'Set' if os.environ.get('AWS_SESSION_TOKEN') else 'Not set'}")
-            
-            # Check the boto3 version
-            print(f"boto3 version: {boto3.__version__}")
+            # Log helpful debugging information from the env snapshot taken
+            # at init - no per-failure os.environ lookups
+            logger.debug("Debugging information:")
+            logger.debug("AWS_REGION: %s", self._debug_env["AWS_REGION"] or "Not set")
+            logger.debug("AWS_BEDROCK_INFERENCE_PROFILE: %s",
+                         self._debug_env["AWS_BEDROCK_INFERENCE_PROFILE"] or "Not set")
+            for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+                logger.debug("%s: %s", name, "Set" if self._debug_env[name] else "Not set")
+            logger.debug("boto3 version: %s", boto3.__version__)
             
-            # Try a direct invocation with minimal parameters as a final fallback
+            # Drop the cached model id and re-probe once - the next run (or
+            # retry) starts directly on whichever model answered
             try:
-                print("\nAttempting fallback invocation with minimal parameters...")
-                
-                # Create a fresh client
-                simple_client = boto3.client('bedrock-runtime', region_name=self.region)
-                
-                # Try different model IDs for fallback
-                fallback_models = [
-                    "anthropic.claude-3-sonnet-20240229-v1:0",
-                    "anthropic.claude-3-haiku-20240307-v1:0",
-                    "anthropic.claude-v2:1",
-                    "anthropic.claude-v2",
-                    "anthropic.claude-instant-v1"
-                ]
-                
-                print(f"Trying fallback models...")
-                response = None
-                
-                for model in fallback_models:
-                    try:
-                        print(f"Attempting with model: {model}")
-                        response = simple_client.invoke_model(
-                            modelId=model,
-                            body=json.dumps({
-                                "anthropic_version": "bedrock-2023-05-31",
-                                "max_tokens": 1000,
-                                "messages": [{"role": "user", "content": "Summarize these logs briefly: " + json.dumps(logs[:5])}]
-                            }),
-                            contentType="application/json",
-                            accept="application/json",
-                        )
-                        if response:
-                            print(f"✓ Successful with model: {model}")
-                            # Save the working model for future use
-                            self.model_id = model
-                            break
-                    except Exception as me:
-                        print(f"✗ Failed with model {model}: {str(me)}")
-                
-                if not response:
-                    raise Exception("All fallback models failed")
-                
-                response_body = json.loads(response['body'].read().decode())
-                print("Fallback successful! You can use this approach for your analysis.")
-                return "ERROR WITH FULL ANALYSIS, BUT FALLBACK TEST WORKED. Please update the code based on debugging information and try again."
-                
+                self._invalidate_cached_model_id()
+                if self._reprobe_model():
+                    fallback_msg = (f"ERROR WITH FULL ANALYSIS, but model {self.model_id} "
+                                    "responded to a probe and was cached for future runs. "
+                                    "Please try again.")
+                    print(fallback_msg)
+                    return fallback_msg
             except Exception as fallback_error:
                 print(f"Fallback attempt also failed: {str(fallback_error)}")
-            
+
             return error_msg
 
-    def process_and_summarize_logs(self, 
+    def _analyze_sharded(self, logs: Union[pd.DataFrame, List[Dict]], stream: bool = True) -> str:
+        """
+        Map-reduce analysis for log sets larger than one prompt budget.
+
+        The logs are split into shards that each fit the byte budget, every
+        shard is condensed into a short summary by a parallel Bedrock call,
+        and a final reduce call runs the full analysis over the summaries.
+        Uses all the data instead of dropping the tail, and the shard calls
+        overlap in wall time.
+
+        Args:
+            logs: Log entries as a DataFrame or a list of dictionaries
+
+        Returns:
+            String containing the analysis results
+        """
+        # Carve the set into budget-sized shards
+        shards = []
+        remaining = logs
+        while len(remaining) > 0 and len(shards) < _MAX_SHARDS:
+            kept, slim = _slim_log_records(remaining)
+            if not kept:
+                break
+            shards.append(_json_dumps_compact(slim))
+            if isinstance(remaining, pd.DataFrame):
+                remaining = remaining.iloc[len(kept):]
+            else:
+                remaining = remaining[len(kept):]
+        if len(remaining) > 0:
+            print(f"Note: {len(remaining)} log entries beyond the {_MAX_SHARDS}-shard cap were dropped")
+        print(f"Log set exceeds one prompt; summarizing {len(shards)} shards in parallel...")
+
+        def _summarize_shard(shard_json):
+            response = self.bedrock_client.invoke_model(
+                modelId=self.model_id,
+                contentType="application/json",
+                accept="application/json",
+                body=_json_dumps_compact({
+                    "anthropic_version": "bedrock-2023-05-31",
+                    "max_tokens": 1024,
+                    "messages": [{
+                        "role": "user",
+                        "content": "Summarize the errors, warnings and notable patterns in this "
+                                   "shard of logs as concise bullet points with counts, affected "
+                                   "pods/services and representative messages:\n\n```json\n"
+                                   + shard_json + "\n```"
+                    }],
+                }),
+            )
+            response_body = _json_loads(response['body'].read())
+            return response_body['content'][0]['text']
+
+        try:
+            self._ensure_connection()
+            # Bounded fan-out keeps the shard calls under Bedrock rate limits
+            summaries = [None] * len(shards)
+            with ThreadPoolExecutor(max_workers=min(_MAX_SHARD_WORKERS, len(shards))) as executor:
+                futures = {executor.submit(_summarize_shard, shard): i
+                           for i, shard in enumerate(shards)}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        summaries[i] = future.result()
+                    except Exception as e:
+                        print(f"Shard {i + 1} summarization failed: {str(e)}")
+            summaries = [s for s in summaries if s]
+        except Exception as e:
+            print(f"Error during sharded analysis: {str(e)}")
+            summaries = []
+
+        if not summaries:
+            # Fall back to the single-call path over what fits in one prompt
+            print("Shard summarization failed; analyzing the budgeted head of the log set...")
+            kept, _ = _slim_log_records(logs)
+            return self.analyze_logs(kept, stream=stream)
+
+        # Reduce: run the full 6-step analysis over the shard summaries
+        reduce_block = (
+            f"The log set was too large for one prompt, so it was summarized in "
+            f"{len(summaries)} shards. Apply the analysis steps above to these "
+            "shard summaries, merging duplicate findings and aggregating counts:\n\n"
+            + "\n\n".join(f"### Shard {i}\n{summary}"
+                          for i, summary in enumerate(summaries, start=1)))
+        return self.analyze_logs_text(reduce_block, stream=stream)
+
+    def analyze_logs_batch(self, jobs: List[Tuple[str, Union[pd.DataFrame, List[Dict]]]]) -> List[str]:
+        """
+        Analyze several log sets in a single Claude call.
+
+        Each Bedrock invocation pays the same network round-trip and model
+        overhead, so batch triage across multiple apps or time windows is
+        much cheaper when the jobs are marshalled into one prompt with
+        numbered sections and the response is split back apart.
+
+        Args:
+            jobs: List of (app_name, logs) pairs
+
+        Returns:
+            List of analysis strings, one per job, in input order
+        """
+        if not jobs:
+            return []
+        if len(jobs) == 1:
+            return [self.analyze_logs(jobs[0][1])]
+
+        # Compose one prompt with a numbered section per job
+        sections = []
+        for i, (app_name, logs) in enumerate(jobs, start=1):
+            if logs is None or len(logs) == 0:
+                sections.append(f"### Job {i} (app={app_name})\n(no logs found)")
+                continue
+            _, slim_records = _slim_log_records(logs)
+            logs_json = _json_dumps_compact(slim_records)
+            sections.append(f"### Job {i} (app={app_name})\n```json\n{logs_json}\n```")
+
+        dynamic_block = (
+            f"Here are {len(jobs)} independent log sets to analyze. "
+            "Analyze each one separately following the instructions above. "
+            "Format your response with one '### Job N' heading per job, in order, "
+            "and nothing before the first heading.\n\n"
+            + "\n\n".join(sections)
+        )
+
+        # If the combined payload is too large for one call, fall back to
+        # per-job calls rather than risking a context-limit rejection
+        if len(dynamic_block) > 400000:
+            print("Batch prompt too large for a single call; analyzing jobs individually...")
+            return [self.analyze_logs(logs) for _, logs in jobs]
+
+        combined = self.analyze_logs_text(dynamic_block)
+
+        # Split the response back into per-job analyses on the numbered headings
+        pieces = re.split(r'^### Job \d+.*$', combined, flags=re.MULTILINE)
+        analyses = [piece.strip() for piece in pieces if piece.strip()]
+        if len(analyses) != len(jobs):
+            # Model did not follow the section format; give every job the
+            # full combined text rather than misattributing sections
+            print(f"Warning: expected {len(jobs)} sections in batch response, got {len(analyses)}")
+            return [combined] * len(jobs)
+        return analyses
+
+    def analyze_logs_text(self, dynamic_block: str, stream: bool = True) -> str:
+        """
+        Run the analysis prompt against an already-composed dynamic block.
+
+        Shares the response cache and fallback path with analyze_logs but
+        skips record preparation, for callers that marshal their own payload.
+
+        Args:
+            dynamic_block: The pre-built log payload portion of the prompt
+            stream: Print the result; concurrent callers pass False
+
+        Returns:
+            String containing the analysis results
+        """
+        prompt = f"{_ANALYSIS_INSTRUCTIONS}\n\n{dynamic_block}"
+        try:
+            cache_key = self._cache_key(prompt, 4096)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.debug("Using cached Bedrock response (skipping API call)")
+                if stream:
+                    print(cached)
+                return cached
+
+            self._ensure_connection()
+
+            try:
+                analysis_text = self._converse_analysis(dynamic_block, stream=stream)
+                self._cache_put(cache_key, analysis_text)
+                return analysis_text
+            except Exception as invoke_error:
+                # Same ladder as analyze_logs: signed-HTTP fallback, which
+                # computes its own cache key and stores the response itself
+                print(f"Standard boto3 invoke failed: {str(invoke_error)}")
+                logger.debug("Attempting custom direct API call...")
+                analysis_text = self.custom_bedrock_invoke(prompt, content=_prompt_content(dynamic_block))
+                if stream:
+                    print(analysis_text)
+                return analysis_text
+        except Exception as e:
+            error_msg = f"Error analyzing logs with Claude: {str(e)}"
+            print(error_msg)
+            return error_msg
+
+    async def _analyze_partial(self, logs, bedrock_client=None, stream: bool = False) -> str:
+        """
+        Analyze one batch of logs without blocking the event loop.
+
+        Uses an aioboto3 Bedrock client when one is passed in; otherwise the
+        synchronous analyze_logs runs on a worker thread. Streaming defaults
+        off because batches usually run concurrently and their delta prints
+        would interleave on stdout.
+
+        Args:
+            logs: Log entries for this batch
+            bedrock_client: Optional aioboto3 bedrock-runtime client
+            stream: Print the analysis as it generates (single-batch only)
+
+        Returns:
+            String containing the analysis for this batch
+        """
+        if bedrock_client is None:
+            return await asyncio.to_thread(self.analyze_logs, logs, stream)
+
+        _, slim_records = _slim_log_records(logs)
+        logs_json = _json_dumps_compact(slim_records)
+        dynamic_block = _DYNAMIC_BLOCK_PREFIX + logs_json + _DYNAMIC_BLOCK_SUFFIX
+        response = await bedrock_client.invoke_model(
+            modelId=self.model_id,
+            contentType="application/json",
+            accept="application/json",
+            body=_json_dumps_compact({
+                "anthropic_version": "bedrock-2023-05-31",
+                "anthropic_beta": ["prompt-caching-2024-07-31"],
+                "max_tokens": 4096,
+                "messages": [{"role": "user", "content": _prompt_content(dynamic_block)}],
+            }),
+        )
+        response_body = _json_loads(await response['body'].read())
+        return response_body['content'][0]['text']
+
+    async def process_and_summarize_logs_async(self,
+                                               app_name: str,
+                                               time_range: str,
+                                               message_contains: Optional[str] = None,
+                                               log_type: Optional[str] = None,
+                                               source: str = "kubernetes",
+                                               batch_size: int = 100) -> Optional[str]:
+        """
+        Async variant of process_and_summarize_logs that overlaps IO stages.
+
+        The fetch runs on a worker thread so the event loop stays free, the
+        logs are split into batches that are analyzed as concurrent Bedrock
+        calls (via aioboto3 when installed), and a final call merges the
+        partial analyses. The fetchers return complete result sets, so the
+        overlap is across the per-batch analysis calls rather than between
+        fetch and analysis.
+
+        Args:
+            app_name: Name of the application
+            time_range: Time range for logs (e.g., "1h", "2d")
+            message_contains: Filter for logs containing this text
+            log_type: Type of logs to filter (error, info, warn)
+            source: Source of logs ("kubernetes", "prometheus" or "loki")
+            batch_size: Number of log entries per analysis batch
+
+        Returns:
+            The merged analysis text, or None if no logs were found
+        """
+        if source.lower() == "kubernetes":
+            fetch = lambda: self.fetch_logs_from_kubernetes(
+                app_name, time_range, message_contains, log_type)
+        elif source.lower() == "prometheus":
+            fetch = lambda: self.fetch_logs_from_prometheus(
+                app_name, time_range, message_contains=message_contains, log_type=log_type)
+        elif source.lower() == "loki":
+            fetch = lambda: self.fetch_logs_from_loki(
+                app_name, time_range, message_contains=message_contains, log_type=log_type)
+        else:
+            print(f"Unknown log source: {source}. Please use 'kubernetes', 'prometheus' or 'loki'.")
+            return None
+
+        logs = await asyncio.to_thread(fetch)
+        if logs is None or len(logs) == 0:
+            print(f"No logs found for {app_name} in the last {time_range}.")
+            return None
+
+        print(f"\nFound {len(logs)} log entries for {app_name} in the last {time_range}.")
+
+        if isinstance(logs, pd.DataFrame):
+            batches = [logs.iloc[i:i + batch_size] for i in range(0, len(logs), batch_size)]
+        else:
+            batches = [logs[i:i + batch_size] for i in range(0, len(logs), batch_size)]
+
+        if len(batches) == 1:
+            return await self._analyze_partial(batches[0], stream=True)
+
+        self._ensure_connection()
+        if _HAS_AIOBOTO3:
+            session = aioboto3.Session()
+            async with session.client("bedrock-runtime", region_name=self.region,
+                                      config=self._boto_config) as brt:
+                results = await asyncio.gather(
+                    *(self._analyze_partial(batch, brt) for batch in batches),
+                    return_exceptions=True)
+        else:
+            results = await asyncio.gather(
+                *(self._analyze_partial(batch) for batch in batches),
+                return_exceptions=True)
+
+        partials = [r for r in results if isinstance(r, str)]
+        for r in results:
+            if not isinstance(r, str):
+                print(f"Batch analysis failed: {str(r)}")
+        if not partials:
+            return None
+        if len(partials) == 1:
+            return partials[0]
+
+        # Final reduce: consolidate the partial analyses in one more call
+        merged_input = "\n\n".join(
+            f"### Partial analysis {i}\n{partial}"
+            for i, partial in enumerate(partials, start=1))
+        reduce_block = (
+            "The logs were analyzed in batches. Merge the partial analyses "
+            "below into one consolidated analysis, deduplicating findings "
+            "and keeping the most frequent/severe issues first:\n\n"
+            + merged_input)
+        return await asyncio.to_thread(self.analyze_logs_text, reduce_block)
+
+    def process_and_summarize_logs(self,
                                   app_name: str, 
                                   time_range: str, 
                                   message_contains: Optional[str] = None, 
@@ -809,7 +1799,7 @@ class LogExplorer:
             time_range: Time range for logs (e.g., "1h", "2d")
             message_contains: Filter for logs containing this text
             log_type: Type of logs to filter (error, info, warn)
-            source: Source of logs ("kubernetes" or "prometheus")
+            source: Source of logs ("kubernetes", "prometheus" or "loki")
         """
         # Fetch logs from specified source
         logs = []
@@ -821,44 +1811,65 @@ class LogExplorer:
             logs = self.fetch_logs_from_prometheus(
                 app_name, time_range, message_contains=message_contains, log_type=log_type
             )
+        elif source.lower() == "loki":
+            logs = self.fetch_logs_from_loki(
+                app_name, time_range, message_contains=message_contains, log_type=log_type
+            )
         else:
-            print(f"Unknown log source: {source}. Please use 'kubernetes' or 'prometheus'.")
+            print(f"Unknown log source: {source}. Please use 'kubernetes', 'prometheus' or 'loki'.")
             return
         
-        # Check if we got any logs
-        if not logs:
+        # Check if we got any logs (works for both the Kubernetes DataFrame
+        # and the Prometheus list of entries)
+        if logs is None or len(logs) == 0:
             print(f"No logs found for {app_name} in the last {time_range}.")
             return
         
         # Print basic log stats
         print(f"\nFound {len(logs)} log entries for {app_name} in the last {time_range}.")
         
-        # Analyze logs using Claude
+        # Analyze logs using Claude - the analysis is streamed to the terminal
+        # as it generates, so it is printed inside analyze_logs
         print("\nAnalyzing logs with Claude 3.7 Sonnet...")
-        analysis = self.analyze_logs(logs)
-        
-        # Print analysis
         print("\n===== LOG ANALYSIS =====\n")
-        print(analysis)
+        analysis = self.analyze_logs(logs)
         print("\n=======================\n")
         
         # Optionally save to file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         log_dir = "log_analysis"
         
-        # Create log_analysis directory if it doesn't exist
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            print(f"Created directory: {log_dir}")
-            
+        # Create log_analysis directory if it doesn't exist; exist_ok makes
+        # this a single race-free syscall instead of an exists+makedirs pair
+        os.makedirs(log_dir, exist_ok=True)
+
+
         filename = os.path.join(log_dir, f"{app_name}_{timestamp}.md")
-        
-        with open(filename, "w") as f:
-            f.write(f"Log Analysis for {app_name} ({time_range}) - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write(analysis)
-            
-        print(f"Analysis saved to {filename}")
+
+        # Build the whole report once and write it in a single call - one
+        # allocation, one encode, one syscall
+        report = (f"Log Analysis for {app_name} ({time_range}) - "
+                  f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n{analysis}")
+
+        # Write the report on a background thread so the disk I/O overlaps
+        # with flushing the analysis to the terminal instead of delaying exit
+        write_errors = []
+
+        def _write_report():
+            try:
+                Path(filename).write_text(report, encoding="utf-8")
+            except OSError as e:
+                write_errors.append(e)
+                print(f"Error saving analysis to {filename}: {str(e)}")
+
+        writer = threading.Thread(target=_write_report)
+        writer.start()
+
         print(f"All log analyses are stored in the '{log_dir}/' directory")
+        # Make sure the report is on disk before claiming success
+        writer.join()
+        if not write_errors:
+            print(f"Analysis saved to {filename}")
 
 
 def main():
@@ -871,24 +1882,36 @@ def main():
     parser.add_argument("--message", "-m", help="Filter logs containing this message")
     parser.add_argument("--log-type", "-l", choices=["error", "warning", "info", "debug"],
                         help="Filter by log level")
-    parser.add_argument("--source", "-s", choices=["kubernetes", "prometheus"], default="kubernetes",
-                        help="Source for logs (kubernetes or prometheus)")
+    parser.add_argument("--source", "-s", choices=["kubernetes", "prometheus", "loki"], default="kubernetes",
+                        help="Source for logs (kubernetes, prometheus or loki)")
     parser.add_argument("--region", "-r", default=None, 
                         help="AWS region for Bedrock (defaults to AWS_REGION env var or eu-west-1)")
     parser.add_argument("--profile", "-p", default=None, 
                         help="AWS Bedrock inference profile ARN (defaults to AWS_BEDROCK_INFERENCE_PROFILE env var)")
     parser.add_argument("--no-ssl-verify", action="store_true",
                         help="Disable SSL certificate verification for Kubernetes API calls")
-    
+    parser.add_argument("--check-connection", action="store_true",
+                        help="Run the AWS Bedrock connection test before fetching logs")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="Show diagnostic output (model selection, API attempts, env state)")
+
     args = parser.parse_args()
-    
+
+    # Diagnostics are DEBUG-level; without --verbose the hot path emits none
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format="%(message)s")
+
     # Create explorer and process logs
     explorer = LogExplorer(
         region=args.region, 
         profile_arn=args.profile, 
         disable_ssl_verify=args.no_ssl_verify
     )
-    
+
+    # Optional explicit pre-flight check (otherwise run lazily on first use)
+    if args.check_connection:
+        explorer.test_bedrock_connection()
+
     explorer.process_and_summarize_logs(
         app_name=args.app,
         time_range=args.time_range,